@@ -1,11 +1,11 @@
+import io
 import os
-import json
-import requests
+import signal
+import orjson
+import asyncio
+import aiohttp
 import discord
-import requests
 from discord.ext import commands
-from bs4 import BeautifulSoup
-import matplotlib.pyplot as plt
 from dotenv import load_dotenv
 import sys
 print("Python version:", sys.version)
@@ -14,27 +14,35 @@ print("🔨 Starting SourceBot.py V3.6")
 # ————————————
 # 1. Configuration
 # ————————————
-from flask import Flask
 import threading
-import os
+from collections import Counter
 
-app = Flask('')
+load_dotenv()
 
-@app.route('/')
-def home():
-    return "Bot is running!"
 
 def run():
+    from flask import Flask  # only loaded when the keep-alive server is enabled
+
+    app = Flask('')
+
+    @app.route('/')
+    def home():
+        return "Bot is running!"
+
     port = int(os.environ.get("PORT", 8080))
     app.run(host='0.0.0.0', port=port)
 
-# Start the web server in a separate thread
-threading.Thread(target=run).start()
+# Start the web server in a separate thread (needed where the host expects a bound port, e.g. Render)
+if os.getenv("ENABLE_KEEPALIVE"):
+    # daemon: must not keep the process alive after the bot shuts down
+    threading.Thread(target=run, daemon=True).start()
 
 
-load_dotenv()
 TOKEN = os.getenv("DISCORD_TOKEN")
 STORE_FILE  = "sources.json"
+JOURNAL_FILE = "sources.log"   # append-only mutations since the last snapshot
+COMPACT_EVERY = 200            # journal entries before folding them into STORE_FILE
+FLUSH_DELAY = 0.5              # seconds to coalesce a burst of mutations into one write
 
 print(f"🔑 TOKEN loaded? {bool(TOKEN)}")
 if TOKEN:
@@ -45,19 +53,83 @@ else:
 # ————————————
 # 2. Persistent Storage
 # ————————————
-if os.path.exists(STORE_FILE) and os.path.getsize(STORE_FILE) > 0:
-    with open(STORE_FILE, "r") as f:
-        sources = json.load(f)
-else:
-    sources = {}  # url -> category
-    with open(STORE_FILE, "w") as f:
-        json.dump(sources, f, indent=2)
+def load_sources():
+    data = {}  # url -> category
+    if os.path.exists(STORE_FILE) and os.path.getsize(STORE_FILE) > 0:
+        with open(STORE_FILE, "rb") as f:
+            data = orjson.loads(f.read())
+    # Replay mutations recorded after the snapshot
+    if os.path.exists(JOURNAL_FILE):
+        with open(JOURNAL_FILE, "rb") as f:
+            for line in f:
+                try:
+                    entry = orjson.loads(line)
+                except orjson.JSONDecodeError:
+                    continue  # torn write from a crash
+                if entry["op"] == "set":
+                    data[entry["url"]] = entry["cat"]
+                elif entry["op"] == "del":
+                    data.pop(entry["url"], None)
+    return data
+
+
+def write_snapshot(snapshot):
+    tmp = STORE_FILE + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(orjson.dumps(snapshot, option=orjson.OPT_INDENT_2))
+    os.replace(tmp, STORE_FILE)
+    JOURNAL.truncate(0)
+
+
+def append_journal(line):
+    JOURNAL.write(line)
+    JOURNAL.flush()
+
+
+sources = load_sources()
+JOURNAL = open(JOURNAL_FILE, "ab")
+write_snapshot(sources)
+journal_entries = 0
+pending = []  # journal lines not yet on disk
+DIRTY = asyncio.Event()
+flusher_task = None
+list_cache = None  # rendered !list_sources text; reset on every mutation
 
 
 # Inside your Discord command handler
-def save_sources():
-    with open(STORE_FILE, "w") as f:
-        json.dump(sources, f, indent=2)
+def save_sources(op, url, cat=None):
+    global list_cache
+    list_cache = None
+    entry = {"op": op, "url": url, "cat": cat} if op == "set" else {"op": op, "url": url}
+    pending.append(orjson.dumps(entry, option=orjson.OPT_APPEND_NEWLINE))
+    DIRTY.set()
+
+
+async def flusher():
+    # Sole disk writer while the bot runs, so journal appends and compactions stay in order
+    global journal_entries
+    while True:
+        await DIRTY.wait()
+        await asyncio.sleep(FLUSH_DELAY)
+        DIRTY.clear()
+        batch = b"".join(pending)
+        pending.clear()
+        try:
+            await asyncio.to_thread(append_journal, batch)
+        except Exception as e:
+            # Keep the batch (ahead of newer entries) and retry on the next pass
+            print(f"❌ Failed to write {JOURNAL_FILE}: {e}")
+            pending.insert(0, batch)
+            DIRTY.set()
+            continue
+        journal_entries += batch.count(b"\n")  # one line per entry
+        if journal_entries >= COMPACT_EVERY:
+            try:
+                await asyncio.to_thread(write_snapshot, dict(sources))
+                journal_entries = 0
+            except Exception as e:
+                # The journal is only truncated after a successful replace, so nothing is lost
+                print(f"❌ Failed to write {STORE_FILE}: {e}")
 
 
 # ————————————
@@ -65,34 +137,60 @@ def save_sources():
 # ————————————
 intents = discord.Intents.default()
 intents.message_content = True
-bot = commands.Bot(command_prefix="!", intents=intents)
+
+
+class SourceBot(commands.Bot):
+    async def close(self):
+        # Release the URL-check session before the loop goes away
+        if SESSION is not None and not SESSION.closed:
+            await SESSION.close()
+        await super().close()
+
+
+bot = SourceBot(command_prefix="!", intents=intents)
 
 
 
 # ————————————
 # 5. On Ready
 # ————————————
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
+                  "AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/115.0 Safari/537.36"
+}
+SESSION = None  # aiohttp.ClientSession, created once the loop is running
+
 @bot.event
 async def on_ready():
+    global SESSION, flusher_task
+    if flusher_task is None:
+        flusher_task = asyncio.create_task(flusher())
+    # on_ready fires again after reconnects; keep the existing session
+    if SESSION is None or SESSION.closed:
+        SESSION = aiohttp.ClientSession(
+            headers=HEADERS,
+            timeout=aiohttp.ClientTimeout(total=5, connect=2),
+        )
     print(f"✅ Bot is online as {bot.user}")
 
 # ————————————
 # 6. Add Source
 # ———————————
 
-import requests
-
-def is_valid_url(url):
+async def is_valid_url(url):
+    if SESSION is None:
+        return False
     try:
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
-                          "AppleWebKit/537.36 (KHTML, like Gecko) "
-                          "Chrome/115.0 Safari/537.36"
-        }
-        # stream=True avoids downloading the full body
-        response = requests.get(url, headers=headers, timeout=5, stream=True, allow_redirects=True)
-        return response.status_code < 400
-    except requests.RequestException:
+        # HEAD avoids downloading the body; some servers answer HEAD with an error
+        # (403/404/405/503...) but serve GET fine, so retry any failure with GET
+        async with SESSION.head(url, allow_redirects=True) as response:
+            if response.status < 400:
+                return True
+        async with SESSION.get(url, allow_redirects=True) as response:
+            return response.status < 400
+    except (aiohttp.ClientError, asyncio.TimeoutError, ValueError):
+        # ValueError: e.g. UnicodeError from IDNA-encoding a malformed host, which aiohttp doesn't wrap
         return False
 
 
@@ -102,11 +200,12 @@ from sourceClassifier import classify_source  # import from wherever you save it
 
 @bot.command()
 async def add_source(ctx, url: str):
-    if not is_valid_url(url):
+    if not await is_valid_url(url):
         return await ctx.send("❌ That doesn't appear to be a valid or reachable URL.")
 
     try:
-        res = classify_source(url, explain=True)
+        # Regex-heavy classification runs on a worker thread to keep the gateway responsive
+        res = await asyncio.to_thread(classify_source, url, explain=False)
         cat = res["category"]
         conf = res["confidence"]
         if conf == 0.25:
@@ -115,7 +214,7 @@ async def add_source(ctx, url: str):
         if cat == "Other":
             cat="Other/Very Biased/Unrelated"
         sources[url] = cat
-        save_sources()
+        save_sources("set", url, cat)
         await ctx.send(
             f"✅ Added: {url}\nCategory: {cat} ({conf:.2%} confident)\n"
         )
@@ -132,7 +231,7 @@ async def remove_source(ctx, url: str):
     if url not in sources:
         return await ctx.send("❌ URL not found.")
     del sources[url]
-    save_sources()
+    save_sources("del", url)
     await ctx.send(f"🗑️ Removed <{url}>")
 
 # ————————————
@@ -148,7 +247,7 @@ async def edit_source(ctx, url: str, new_category: str):
     if new_cat not in valid:
         return await ctx.send(f"❌ Invalid category. Choose one of {valid}.")
     sources[url] = new_cat
-    save_sources()
+    save_sources("set", url, new_cat)
     await ctx.send(f"✏️ Updated <{url}> → **{new_cat}**")
 
 # ————————————
@@ -156,24 +255,51 @@ async def edit_source(ctx, url: str, new_category: str):
 # ————————————
 @bot.command(name="list_sources")
 async def list_sources(ctx):
+    global list_cache
     print("list sources triggered")
     if not sources:
         return await ctx.send("No sources recorded yet.")
-    lines = [f"<{u}> → **{c}**" for u, c in sources.items()]
-    await ctx.send("\n".join(lines))
+    if list_cache is None:
+        list_cache = "\n".join(f"<{u}> → **{c}**" for u, c in sources.items())
+    # Discord rejects messages over 2000 characters; send long listings as a file
+    if len(list_cache) > 1900:
+        return await ctx.send(file=discord.File(io.BytesIO(list_cache.encode()), filename="sources.txt"))
+    await ctx.send(list_cache)
 
 # ————————————
 # 10. Summary & Pie Chart
 # ————————————
+# One figure is reused across calls; the lock stops two renders sharing it at once.
+# matplotlib is imported on first use so bots that never chart don't pay for it.
+CHART_FIG = CHART_AX = None
+CHART_LOCK = asyncio.Lock()
+last_chart = (None, None)  # (counts key, PNG bytes) of the most recent render
+
+
+def render_chart(labels, sizes):
+    global CHART_FIG, CHART_AX
+    if CHART_FIG is None:
+        import matplotlib
+        matplotlib.use("Agg")  # headless: no GUI backend probing
+        import matplotlib.pyplot as plt
+        CHART_FIG, CHART_AX = plt.subplots()
+    CHART_AX.clear()
+    CHART_AX.pie(sizes, labels=labels, autopct="%1.1f%%", startangle=90)
+    CHART_AX.axis("equal")
+    buf = io.BytesIO()
+    CHART_FIG.savefig(buf, format="png")
+    return buf.getvalue()
+
+
 @bot.command(name="summary")
 async def summary(ctx):
+    global last_chart
     if not sources:
         return await ctx.send("No sources to summarize.")
 
     # Count categories
-    counts = { "Primary":0, "Secondary":0, "Tertiary":0, "Other/Very Biased/Unrelated":0 }
-    for cat in sources.values():
-        counts[cat] = counts.get(cat, 0) + 1
+    counts = Counter({ "Primary":0, "Secondary":0, "Tertiary":0, "Other/Very Biased/Unrelated":0 })
+    counts.update(sources.values())
 
     # Compute total valid sources
     total_valid = counts["Primary"] + counts["Secondary"] + counts["Tertiary"]
@@ -181,12 +307,15 @@ async def summary(ctx):
     # Generate pie chart
     labels = list(counts.keys())
     sizes  = [counts[lbl] for lbl in labels]
-    fig, ax = plt.subplots()
-    ax.pie(sizes, labels=labels, autopct="%1.1f%%", startangle=90)
-    ax.axis("equal")
-    chart_path = "source_pie.png"
-    fig.savefig(chart_path)
-    plt.close(fig)
+    chart_key = tuple(sorted(counts.items()))
+    async with CHART_LOCK:
+        # Same breakdown as last time: reuse the PNG instead of redrawing
+        if last_chart[0] == chart_key:
+            png = last_chart[1]
+        else:
+            # Import, draw and encode all happen off the event loop
+            png = await asyncio.to_thread(render_chart, labels, sizes)
+            last_chart = (chart_key, png)
 
     # Build summary message
     msg_lines = []
@@ -199,7 +328,11 @@ async def summary(ctx):
 
     # Send
     await ctx.send(summary_text)
-    await ctx.send(file=discord.File(chart_path))
-    os.remove(chart_path)
-bot.run(TOKEN)
+    await ctx.send(file=discord.File(io.BytesIO(png), filename="source_pie.png"))
+# Treat SIGTERM (host restarts/redeploys) like Ctrl+C so the final snapshot below is written
+signal.signal(signal.SIGTERM, signal.default_int_handler)
+try:
+    bot.run(TOKEN)
+finally:
+    write_snapshot(sources)
 
@@ -23,6 +23,10 @@ from __future__ import annotations
 import re
 import math
 import json
+import string
+import hashlib
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Dict, List, Tuple, Optional
@@ -153,6 +157,23 @@ STRUCTURE_TERTIARY_HEADERS = {
     "see also", "references", "external links", "further reading"
 }
 
+# Whole-word body-text cues, all matched in a single scan by body_text_voter.
+# Each group: (voter name, terms, votes cast once if any term appears)
+BODY_TERM_GROUPS = [
+    # Structured sections typical of Secondary scholarship
+    *(("structure", [h], [("Secondary", 0.6, f"struct:secondary:{h}")])
+      for h in sorted(STRUCTURE_SECONDARY_HEADERS)),
+    # Reference-like sections can indicate Secondary/Tertiary
+    ("structure", ["references", "bibliography", "works cited", "further reading"],
+     [("Secondary", 0.8, "struct:references"), ("Tertiary", 0.4, "struct:references:ter")]),
+    # Definition-heavy content can tilt Tertiary slightly
+    ("structure", ["definition", "definitions", "terminology", "nomenclature", "lexicon"],
+     [("Tertiary", 0.6, "struct:definitions")]),
+    # Very technical spec-like language (crude)
+    ("artifact", ["must", "shall", "should", "may", "conform", "requirement"],
+     [("Primary", 0.7, "artifact:spec_language")]),
+]
+
 # Smoothing/normalization
 # - No single voter dominates: per-voter contribution cap
 # - Per-category cap to bound evidence
@@ -161,6 +182,20 @@ PER_VOTER_CAP = 3.5
 PER_CATEGORY_CAP = 8.0
 SOFTMAX_TEMP = 1.25
 
+# Safety bound on recorded trigger strings per classification. Voters cast at most one vote per
+# distinct cue (~66 possible today), so this only matters if voters start emitting per-match votes.
+MAX_TRIGGERS = 128
+
+# Above this many characters, ASCII-only text is scanned for years with bytes.find instead of the
+# regex. Non-ASCII text always uses the regex, whose \b and \d are Unicode-aware ("é1995", "19٩٠").
+# Each "18"/"19"/"20" hit costs a Python-level check (~10x the regex's per-character cost), so the
+# bytes scan is also skipped when hits exceed 1 per YEAR_BYTES_MAX_DENSITY characters.
+YEAR_BYTES_SCAN_MIN = 100_000
+YEAR_BYTES_MAX_DENSITY = 10
+
+# Memoized results, keyed by (url, html digest, date hint, explain)
+CLASSIFY_CACHE_SIZE = 1024
+
 # Explicit overrides for known pages (url substring -> forced classification)
 EXPLICIT_OVERRIDES = {
     # CERN modern retrospective page should be Secondary
@@ -168,6 +203,43 @@ EXPLICIT_OVERRIDES = {
 }
 
 
+# ------------------------
+# PRECOMPILED PATTERNS
+# ------------------------
+
+META_NAMES = ["description", "author", "keywords"]
+META_PROPERTIES = ["og:title", "og:description", "twitter:title", "twitter:description"]
+META_TIME_PROPERTIES = ["article:published_time", "article:modified_time", "og:updated_time"]
+
+# keyword -> (category, weight), in voting order
+KEYWORD_INDEX = {
+    kw: (cat, w)
+    for cat, kws in [
+        ("Primary", PRIMARY_KEYWORDS),
+        ("Secondary", SECONDARY_KEYWORDS),
+        ("Tertiary", TERTIARY_KEYWORDS),
+        ("Other", OTHER_KEYWORDS),
+    ]
+    for kw, w in kws.items()
+}
+
+_WS_RE = re.compile(r"\s+")
+_SCRIPT_STYLE_RE = re.compile(r"(?is)<(script|style).*?>.*?</\1>")
+_TAG_RE = re.compile(r"(?is)<[^>]+>")
+_TITLE_RE = re.compile(r"(?is)<title[^>]*>(.*?)</title>")
+# Quote-aware so a ">" inside an attribute value does not end the tag
+_META_TAG_RE = re.compile(r"""(?is)<meta\b((?:"[^"]*"|'[^']*'|[^'">])*)>""")
+_ATTR_RE = re.compile(r"""(?is)([a-z_:-]+)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s"'>]+))""")
+_YEAR_RE = re.compile(r"\b(?:18|19|20)\d{2}\b")
+_WORD_BYTES = frozenset((string.ascii_letters + string.digits + "_").encode())
+# term -> index into BODY_TERM_GROUPS; the regex runs over lowercased text
+_BODY_TERM_GROUP = {term: i for i, (_, terms, _) in enumerate(BODY_TERM_GROUPS) for term in terms}
+_BODY_TERMS_RE = re.compile(
+    r"\b(?:" + "|".join(map(re.escape, sorted(_BODY_TERM_GROUP, key=len, reverse=True))) + r")\b"
+)
+_QUOTE_RE = re.compile(r"[“\"\'].*?[”\"\']")
+
+
 # ------------------------
 # UTILITIES
 # ------------------------
@@ -177,7 +249,7 @@ def now_year() -> int:
 
 
 def normalize_ws(s: str) -> str:
-    return re.sub(r"\s+", " ", s or "").strip()
+    return _WS_RE.sub(" ", s or "").strip()
 
 
 def safe_lower(s: Optional[str]) -> str:
@@ -194,9 +266,9 @@ def strip_tags(html: str) -> str:
     if not html:
         return ""
     # Remove scripts/styles
-    html = re.sub(r"(?is)<(script|style).*?>.*?</\1>", " ", html)
+    html = _SCRIPT_STYLE_RE.sub(" ", html)
     # Remove tags
-    html = re.sub(r"(?is)<[^>]+>", " ", html)
+    html = _TAG_RE.sub(" ", html)
     # Unescape entities (basic)
     html = html.replace("&nbsp;", " ").replace("&amp;", "&")
     html = html.replace("&lt;", "<").replace("&gt;", ">").replace("&quot;", '"').replace("&#39;", "'")
@@ -204,35 +276,68 @@ def strip_tags(html: str) -> str:
 
 
 def extract_title(html: str) -> str:
-    m = re.search(r"(?is)<title[^>]*>(.*?)</title>", html or "")
+    m = _TITLE_RE.search(html or "")
     return normalize_ws(m.group(1)) if m else ""
 
 
 def extract_meta(html: str) -> Dict[str, str]:
     # Pulls common meta tags: description, og:title, og:description, twitter:title, twitter:description
+    # plus publication/update time (loose). Single pass over <meta> tags; attribute order does not matter.
     meta = {}
-    for name in ["description", "author", "keywords"]:
-        m = re.search(rf'(?is)<meta[^>]+name=["\']{name}["\'][^>]*content=["\'](.*?)["\']', html or "")
-        if m:
-            meta[name] = normalize_ws(m.group(1))
-    for prop in ["og:title", "og:description", "twitter:title", "twitter:description"]:
-        m = re.search(rf'(?is)<meta[^>]+property=["\']{prop}["\'][^>]*content=["\'](.*?)["\']', html or "")
-        if m:
-            meta[prop] = normalize_ws(m.group(1))
-    # Publication/update time (loose)
-    for time_key in ["article:published_time", "article:modified_time", "og:updated_time"]:
-        m = re.search(rf'(?is)<meta[^>]+property=["\']{time_key}["\'][^>]*content=["\'](.*?)["\']', html or "")
-        if m:
-            meta[time_key] = normalize_ws(m.group(1))
+    for tag in _META_TAG_RE.finditer(html or ""):
+        attrs = {}
+        for a in _ATTR_RE.finditer(tag.group(1)):
+            attrs.setdefault(a.group(1).lower(), next(v for v in a.groups()[1:] if v is not None))
+        if "content" not in attrs:
+            continue
+        name = attrs.get("name", "").lower()
+        prop = attrs.get("property", "").lower()
+        if name in META_NAMES:
+            key = name
+        elif prop in META_PROPERTIES or prop in META_TIME_PROPERTIES:
+            key = prop
+        else:
+            continue
+        if key not in meta:  # first occurrence wins
+            meta[key] = normalize_ws(attrs["content"])
     return meta
 
 
+def _iter_years_bytes(buf: bytes):
+    # Same matches as _YEAR_RE (ASCII word boundaries), but driven by C-level bytes.find
+    n = len(buf)
+    for prefix in (b"18", b"19", b"20"):
+        i = buf.find(prefix)
+        while i != -1:
+            j = i + 4
+            if (j <= n and buf[i + 2:j].isdigit()
+                    and (i == 0 or buf[i - 1] not in _WORD_BYTES)
+                    and (j == n or buf[j] not in _WORD_BYTES)):
+                yield int(buf[i:j])
+                i = buf.find(prefix, j)
+            else:
+                i = buf.find(prefix, i + 2)
+
+
 def extract_years(text: str) -> Tuple[Optional[int], Optional[int]]:
-    years = {int(y) for y in re.findall(r"\b(18|19|20)\d{2}\b", text)
-             if 1800 < int(y) <= now_year()}
-    if not years:
-        return None, None
-    return min(years), max(years)
+    # Single streaming pass: (earliest, latest) plausible year, no intermediate set
+    years = None
+    if len(text) > YEAR_BYTES_SCAN_MIN and text.isascii():
+        buf = text.encode("ascii")
+        hits = buf.count(b"18") + buf.count(b"19") + buf.count(b"20")
+        if hits * YEAR_BYTES_MAX_DENSITY < len(buf):
+            years = _iter_years_bytes(buf)
+    if years is None:
+        years = (int(m.group()) for m in _YEAR_RE.finditer(text))
+    lo = hi = None
+    cur = now_year()
+    for y in years:
+        if 1800 < y <= cur:
+            if lo is None or y < lo:
+                lo = y
+            if hi is None or y > hi:
+                hi = y
+    return lo, hi
 
 
 def parse_url(url: str) -> Dict[str, str]:
@@ -255,11 +360,6 @@ def looks_like_pdf(url: str, html_text: str) -> bool:
     return False
 
 
-def has_references_section(text: str) -> bool:
-    # Signals Secondary/Tertiary editorial structure
-    return bool(re.search(r"\b(references|bibliography|works cited|further reading)\b", safe_lower(text)))
-
-
 # ------------------------
 # DATA STRUCTURES
 # ------------------------
@@ -280,7 +380,8 @@ class Tally:
         # Per-vote cap to prevent spikes
         amt_capped = max(-PER_VOTER_CAP, min(PER_VOTER_CAP, amt))
         self.scores[cat] += amt_capped
-        self.triggers.append(f"{reason}+{amt_capped:.2f}")
+        if len(self.triggers) < MAX_TRIGGERS:
+            self.triggers.append(f"{reason}+{amt_capped:.2f}")
 
     def cap_categories(self):
         for cat in self.scores:
@@ -321,25 +422,13 @@ def url_path_voter(url_parts: Dict[str, str]) -> List[Vote]:
     return votes
 
 
-def keyword_voter(text_candidates: List[str]) -> List[Vote]:
+def keyword_voter(lower_all: str) -> List[Vote]:
     votes = []
-    joined = " ".join(filter(None, (safe_lower(t) for t in text_candidates)))
-    # Primary
-    for kw, w in PRIMARY_KEYWORDS.items():
-        if kw in joined:
-            votes.append(Vote("Primary", w, f"kw:primary:{kw}"))
-    # Secondary
-    for kw, w in SECONDARY_KEYWORDS.items():
-        if kw in joined:
-            votes.append(Vote("Secondary", w, f"kw:secondary:{kw}"))
-    # Tertiary
-    for kw, w in TERTIARY_KEYWORDS.items():
-        if kw in joined:
-            votes.append(Vote("Tertiary", w, f"kw:tertiary:{kw}"))
-    # Other
-    for kw, w in OTHER_KEYWORDS.items():
-        if kw in joined:
-            votes.append(Vote("Other", w, f"kw:other:{kw}"))
+    # str.__contains__ is a C-level fast search; for ~30 keywords it beats a regex
+    # alternation or an Aho-Corasick automaton, so keep plain substring tests
+    for kw, (cat, w) in KEYWORD_INDEX.items():
+        if kw in lower_all:
+            votes.append(Vote(cat, w, f"kw:{cat.lower()}:{kw}"))
     return votes
 
 
@@ -366,22 +455,18 @@ def date_voter(text_for_dates: str, meta: Dict[str, str]) -> List[Vote]:
     return votes
 
 
-def structure_voter(full_text: str) -> List[Vote]:
-    votes = []
-    text = safe_lower(full_text)
-    # Structured sections typical of Secondary scholarship
-    for h in STRUCTURE_SECONDARY_HEADERS:
-        if re.search(rf"\b{re.escape(h)}\b", text):
-            votes.append(Vote("Secondary", 0.6, f"struct:secondary:{h}"))
-    # Reference-like sections can indicate Secondary/Tertiary
-    if has_references_section(text):
-        votes.append(Vote("Secondary", 0.8, "struct:references"))
-        votes.append(Vote("Tertiary", 0.4, "struct:references:ter"))
-
-    # Definition-heavy content can tilt Tertiary slightly
-    if re.search(r"\b(definitions?|terminology|nomenclature|lexicon)\b", text):
-        votes.append(Vote("Tertiary", 0.6, "struct:definitions"))
-
+def body_text_voter(lower_body: str) -> Dict[str, List[Vote]]:
+    # Structure headers, reference/definition sections and spec language in one pass;
+    # returns votes grouped by the voter name they are attributed to
+    votes: Dict[str, List[Vote]] = {voter: [] for voter, _, _ in BODY_TERM_GROUPS}
+    hit = set()
+    for m in _BODY_TERMS_RE.finditer(lower_body):
+        hit.add(_BODY_TERM_GROUP[m.group()])
+        if len(hit) == len(BODY_TERM_GROUPS):
+            break
+    for i, (voter, _, group_votes) in enumerate(BODY_TERM_GROUPS):
+        if i in hit:
+            votes[voter].extend(Vote(*v) for v in group_votes)
     return votes
 
 
@@ -392,11 +477,8 @@ def artifact_voter(url_parts: Dict[str, str], title: str, text: str) -> List[Vot
         votes.append(Vote("Primary", 1.2, "artifact:pdf"))
     if "/rfc/" in url_parts["path"] or "rfc " in safe_lower(title):
         votes.append(Vote("Primary", 1.8, "artifact:rfc"))
-    # Presence of code blocks or very technical spec-like language (crude)
-    if re.search(r"\b(must|shall|should|may|conform|requirement)\b", safe_lower(text)):
-        votes.append(Vote("Primary", 0.7, "artifact:spec_language"))
     # Heavy quoting of named individuals + years may indicate Secondary synthesis (citations)
-    quotes = len(re.findall(r"[“\"\'].*?[”\"\']", text))
+    quotes = len(_QUOTE_RE.findall(text))
     if quotes >= 8:
         votes.append(Vote("Secondary", 0.6, "artifact:heavy_quotes"))
     return votes
@@ -418,6 +500,11 @@ def softmax(scores: Dict[str, float], temp: float = SOFTMAX_TEMP) -> Dict[str, f
 # CORE CLASSIFIER
 # ------------------------
 
+# classify_source may be called from worker threads, so the LRU is guarded by a lock
+_CLASSIFY_CACHE: "OrderedDict[tuple, Dict[str, object]]" = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+
+
 def classify_source(
     url: str,
     raw_html: str = "",
@@ -440,7 +527,42 @@ def classify_source(
     - confidences: dict per category (softmax distribution)
     - explanation: str (if explain=True)
     - triggers: list of detailed signals
+
+    Results are memoized (LRU, CLASSIFY_CACHE_SIZE entries) on the URL and a digest of raw_html,
+    so re-classifying an unchanged page is O(1).
     """
+    html_hash = hashlib.blake2b((raw_html or "").encode("utf-8", "surrogatepass"), digest_size=8).digest()
+    key = (url, html_hash, meta_date_hint, explain)
+    with _CACHE_LOCK:
+        res = _CLASSIFY_CACHE.get(key)
+        if res is not None:
+            _CLASSIFY_CACHE.move_to_end(key)
+            return _copy_result(res)
+
+    res = _classify_impl(url, raw_html, meta_date_hint, explain)
+    with _CACHE_LOCK:
+        _CLASSIFY_CACHE[key] = _copy_result(res)
+        if len(_CLASSIFY_CACHE) > CLASSIFY_CACHE_SIZE:
+            _CLASSIFY_CACHE.popitem(last=False)
+    return res
+
+
+def _copy_result(res: Dict[str, object]) -> Dict[str, object]:
+    # Copy the nested containers too, so callers can't mutate a cached entry
+    return {
+        **res,
+        "scores": dict(res["scores"]),
+        "confidences": dict(res["confidences"]),
+        "triggers": list(res["triggers"]),
+    }
+
+
+def _classify_impl(
+    url: str,
+    raw_html: str,
+    meta_date_hint: Optional[str],
+    explain: bool,
+) -> Dict[str, object]:
     url_l = safe_lower(url)
     # Explicit overrides
     for sub, cat in EXPLICIT_OVERRIDES.items():
@@ -462,30 +584,33 @@ def classify_source(
     title = extract_title(html)
     meta = extract_meta(html)
     body_text = strip_tags(html)
-    text_for_kw = " ".join([
-        title,
-        meta.get("description", ""),
-        meta.get("og:title", ""),
-        meta.get("og:description", ""),
-        meta.get("twitter:title", ""),
-        meta.get("twitter:description", ""),
-        body_text
+    # Lowercase the (possibly large) body once and share it across the text voters
+    lower_body = body_text.lower()
+    lower_all = " ".join([
+        title.lower(),
+        meta.get("description", "").lower(),
+        meta.get("og:title", "").lower(),
+        meta.get("og:description", "").lower(),
+        meta.get("twitter:title", "").lower(),
+        meta.get("twitter:description", "").lower(),
+        lower_body
     ])
 
     # If an external date hint is present, inject into the analysis text
     if meta_date_hint:
-        text_for_kw += f" {meta_date_hint}"
+        lower_all += f" {meta_date_hint.lower()}"
 
     tally = Tally()
 
     # Run voters
+    body_votes = body_text_voter(lower_body)
     voters = [
         ("domain", domain_voter(parts)),
         ("url_path", url_path_voter(parts)),
-        ("keywords", keyword_voter([title, meta.get("description", ""), text_for_kw])),
-        ("dates", date_voter(text_for_kw, meta)),
-        ("structure", structure_voter(body_text)),
-        ("artifact", artifact_voter(parts, title, body_text)),
+        ("keywords", keyword_voter(lower_all)),
+        ("dates", date_voter(lower_all, meta)),
+        ("structure", body_votes["structure"]),
+        ("artifact", artifact_voter(parts, title, body_text) + body_votes["artifact"]),
     ]
 
     for voter_name, votes in voters:
@@ -510,7 +635,7 @@ def classify_source(
             f"Confidences: {json.dumps(confidences, ensure_ascii=False)}\n"
             f"Title: {title}\n"
             f"Meta: {json.dumps(meta, ensure_ascii=False)}\n"
-            f"Triggers:\n  - " + "\n  - ".join(tally.triggers[:300])  # guard against enormous pages
+            f"Triggers:\n  - " + "\n  - ".join(tally.triggers)
         )
 
     return {